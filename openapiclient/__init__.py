@@ -1,3 +1,3 @@
-from .client import OpenAPIClient
+from .client import APIResponse, OpenAPIClient, Operation
 
-__all__ = ['OpenAPIClient']
+__all__ = ['APIResponse', 'OpenAPIClient', 'Operation']
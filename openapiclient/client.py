@@ -1,9 +1,168 @@
+import asyncio
+import hashlib
 import httpx
+import importlib.util
+import inspect
 import json
+import keyword
 import os.path
-from urllib.parse import urljoin, urlparse
+import pickle
+from urllib.parse import quote, urljoin, urlparse
 import yaml
 import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+from typing import Any, Mapping, NamedTuple, Optional
+
+# httpx does not export the helper it uses to read proxies from the environment
+try:
+    from httpx._utils import get_environment_proxies
+except ImportError:
+    def get_environment_proxies():
+        """Fallback for httpx versions without the helper, no environment proxies are mounted"""
+        return {}
+
+# Prefer the libyaml-backed loader, fall back to the pure-Python one
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+# orjson is an optional, faster JSON decoder and encoder
+try:
+    from orjson import dumps as _json_dumps, loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
+    def _json_dumps(obj):
+        """Serialize to compact JSON bytes, like orjson.dumps"""
+        return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode()
+
+# HTTP/2 in httpx needs the optional h2 package (pip install httpx[http2])
+HTTP2_AVAILABLE = importlib.util.find_spec('h2') is not None
+
+# Defaults for the client sessions, tuned for many concurrent operation calls
+SESSION_DEFAULTS = {
+    'http2': HTTP2_AVAILABLE,
+    'limits': httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=30.0),
+    'timeout': httpx.Timeout(30.0, connect=5.0),
+}
+
+# Number of times a failed connection attempt is retried by the default transport
+DEFAULT_RETRIES = 3
+
+# Session options that configure the connection pool, and so have to be given to the transport
+TRANSPORT_OPTIONS = ('verify', 'cert', 'trust_env', 'http1', 'http2', 'limits')
+
+
+def build_session_options(defaults, kwargs, transport_class):
+    """
+    Merge session defaults with user options and add a retrying transport.
+
+    Args:
+        defaults: Default httpx client options
+        kwargs: Options given by the user, these take precedence. May contain 'retries', and
+            'pool_limits' as an httpx.Limits or a dict of its arguments
+        transport_class: httpx.HTTPTransport or httpx.AsyncHTTPTransport
+
+    Returns:
+        dict: Keyword arguments for the httpx client
+    """
+    options = {**defaults, **kwargs}
+    retries = options.pop('retries', DEFAULT_RETRIES)
+    pool_limits = options.pop('pool_limits', None)
+    if pool_limits is not None:
+        options['limits'] = pool_limits if isinstance(pool_limits, httpx.Limits) else httpx.Limits(**pool_limits)
+    if 'transport' not in options:
+        # httpx ignores the pool options once a transport is given, so hand them to it
+        transport_kwargs = {name: options[name] for name in TRANSPORT_OPTIONS if name in options}
+        options['transport'] = transport_class(retries=retries, **transport_kwargs)
+        # httpx also stops reading HTTP(S)_PROXY/ALL_PROXY/NO_PROXY once a transport is given,
+        # so mount retrying proxy transports for them the way httpx itself would
+        if options.get('trust_env', True) and 'proxy' not in options:
+            mounts = {
+                # Older httpx transports only take an httpx.Proxy, not a URL string
+                pattern: None if proxy is None else transport_class(
+                    retries=retries, proxy=httpx.Proxy(proxy), **transport_kwargs
+                )
+                for pattern, proxy in get_environment_proxies().items()
+            }
+            if mounts:
+                options['mounts'] = {**mounts, **options.get('mounts', {})}
+    return options
+
+
+class APIResponse(NamedTuple):
+    """
+    Result of an operation call, shaped like an axios response.
+
+    Fields can be read as attributes (response.data) or by key (response['data']).
+    """
+    data: Any
+    status: int
+    headers: Mapping[str, str]
+    config: dict
+
+    def __getitem__(self, key):
+        """Look up a field by name, or by position like a plain tuple"""
+        if isinstance(key, str):
+            if key in self._fields:
+                return getattr(self, key)
+            raise KeyError(key)
+        return tuple.__getitem__(self, key)
+
+    def __contains__(self, key):
+        """Check whether a field name exists"""
+        return key in self._fields
+
+    def get(self, key, default=None):
+        """Return a field by name, or default if there is no such field"""
+        return getattr(self, key) if key in self._fields else default
+
+    def keys(self):
+        """Return the field names"""
+        return self._fields
+
+    def values(self):
+        """Return the field values, in field order"""
+        return tuple(self)
+
+    def items(self):
+        """Return (field name, value) pairs"""
+        return tuple(zip(self._fields, self))
+
+    def to_dict(self):
+        """Return the response as a plain dict, with the headers copied into a dict"""
+        return {'data': self.data, 'status': self.status, 'headers': dict(self.headers), 'config': self.config}
+
+
+class Operation(NamedTuple):
+    """An operation of the definition, with the fields the client uses"""
+    operation_id: str
+    path: str
+    method: str
+    parameters: list
+    request_body: Any
+    servers: list
+    security: Any
+    summary: str
+    description: str
+
+
+class CompiledOperation(NamedTuple):
+    """Call metadata of an operation, computed once and shared by every client"""
+    path_names: tuple
+    query_names: tuple
+    header_names: frozenset
+    cookie_names: frozenset
+    has_body: bool
+    option_names: frozenset
+    url_template: str
+    url_format: str
+    url_fields: tuple
+    signature: inspect.Signature
+    doc: Optional[str]
 
 
 # 合并DynamicClientBase和BaseClient为一个基类
@@ -14,51 +173,94 @@ class BaseClient:
         """Initialize the base client"""
         self.api = api
         self.session = None
+        # Whether the session was created by this client rather than given to the OpenAPIClient
+        self._owns_session = False
         self.operations = []
         self.paths = []
-        self.tools = []
+        self._methods = {}
+        self._operation_map = {}
+        self._is_async = False
+        self._operations_raw = []
+
+    def _get_method(self, name):
+        """
+        Return the method of an operation, creating it on first use.
+
+        Args:
+            name: The operation id
 
-    @property
+        Returns:
+            function: The operation method, or None if there is no such operation
+        """
+        method = self._methods.get(name)
+        if method is None:
+            operation = self._operation_map.get(name)
+            if operation is None:
+                return None
+            method = self.api._create_operation_method(self, operation.path, operation.method, operation,
+                                                       self._is_async)
+            self._methods[name] = method
+        return method
+
+    def __getattr__(self, name):
+        """Resolve generated operation methods, only called when normal attribute lookup fails"""
+        # Guard against lookups before __init__ has set up the operations
+        method = self._get_method(name) if '_operation_map' in self.__dict__ else None
+        if method is None:
+            raise AttributeError(f"'{self.__class__.__name__}' object has no attribute '{name}'")
+        return method
+
+    def __dir__(self):
+        """List the operation methods too, for REPL and IDE completion"""
+        return [*super().__dir__(), *self.__dict__.get('_operation_map', ())]
+
+    @cached_property
+    def tools(self):
+        """AI tool definitions for all operations, built on first access"""
+        if not self._operations_raw:
+            # Not entered yet, the definition may not even be loaded
+            return []
+        return self.api._build_tools(self._operations_raw)
+
+    @cached_property
+    def tools_json(self):
+        """The tool definitions serialized as JSON bytes, ready to send to a model API"""
+        return _json_dumps(self.tools)
+
+    @cached_property
     def functions(self):
-        """Return all operation methods available in this client"""
-        return {name: getattr(self, name) for name in self.operations if hasattr(self, name)}
+        """Return all operation methods available in this client, built once"""
+        return {name: self._get_method(name) for name in self._operation_map}
 
     def __getitem__(self, name):
         """Allow dictionary-like access to operations by name"""
-        if name in self.operations and hasattr(self, name):
-            return getattr(self, name)
-        raise KeyError(f"Operation '{name}' not found")
+        method = self._get_method(name)
+        if method is None:
+            raise KeyError(f"Operation '{name}' not found")
+        return method
 
     def __iter__(self):
         """Allow iteration over all operation names"""
-        return iter(self.functions)
+        return iter(self._operation_map)
 
     def __call__(self, method_name, *args, **kwargs):
         """Allow calling methods by name with partial application"""
-        if method_name not in self.operations:
+        method = self._get_method(method_name)
+        if method is None:
             raise AttributeError(f"'{self.__class__.__name__}' has no operation '{method_name}'")
 
-        method = getattr(self, method_name, None)
-        if not method or not callable(method):
-            raise AttributeError(f"'{self.__class__.__name__}' has no callable method '{method_name}'")
-
         return method(*args, **kwargs)
 
     def setup_base_url(self):
         """Set up the base URL for API requests"""
         if 'servers' in self.api.definition and self.api.definition['servers']:
-            server_url = self.api.definition['servers'][0]['url']
-            
-            parsed_url = urlparse(server_url)
-            
-            if parsed_url.scheme:
-                self.api.base_url = server_url
-            elif self.api.source_url:
-                source_parsed = urlparse(self.api.source_url)
-                base = f"{source_parsed.scheme}://{source_parsed.netloc}"
-                self.api.base_url = urljoin(base, server_url)
-            else:
-                self.api.base_url = server_url
+            self.api.base_url = self.api.resolve_server_url(self.api.definition['servers'][0]['url'])
+
+        # Operation URLs are already absolute, the session base URL only lets requests made
+        # directly on the session use paths relative to the API server. A session given by
+        # the caller, or a base URL given for it, is left alone
+        if self._owns_session and not str(self.session.base_url) and urlparse(self.api.base_url).scheme:
+            self.session.base_url = self.api.base_url
 
 class Client(BaseClient):
     """
@@ -69,23 +271,44 @@ class Client(BaseClient):
     def __init__(self, api, **kwargs):
         """Initialize the sync client"""
         super().__init__(api)
-        self.session = api.httpx_client or httpx.Client(**kwargs)
+        self._owns_session = api.httpx_client is None
+        self.session = api.httpx_client or httpx.Client(**build_session_options(SESSION_DEFAULTS, kwargs, httpx.HTTPTransport))
 
     def __enter__(self):
         """Enter context manager and initialize the client"""
         if not self.api.definition:
-            self.api._load_definition_sync()
+            # Fetch the definition with the operation session to reuse its connection
+            self.api._load_definition_sync(self.session)
 
         self.setup_base_url()
-        # Generate methods directly on this instance
+        # Generate the operation methods for this instance
         self.api._generate_client_methods(self, is_async=False)
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Exit context manager and close resources"""
+        self.close()
+
+    def close(self):
+        """Close the HTTP session, for clients created with OpenAPIClient.build()"""
         if self.session:
             self.session.close()
 
+    def batch(self, calls, max_concurrency=10):
+        """
+        Call several operations concurrently using a thread pool.
+
+        Args:
+            calls: Iterable of (operation_name, kwargs) pairs
+            max_concurrency: Maximum number of requests in flight at once
+
+        Returns:
+            list: The responses, in the same order as calls
+        """
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            futures = [executor.submit(self, name, **kwargs) for name, kwargs in calls]
+            return [future.result() for future in futures]
+
 
 class AsyncClient(BaseClient):
     """
@@ -93,26 +316,88 @@ class AsyncClient(BaseClient):
     Acts as both the client and the container for API operations.
     """
 
-    def __init__(self, api, **kwargs):
-        """Initialize the async client"""
+    def __init__(self, api, coalesce_requests=False, **kwargs):
+        """
+        Initialize the async client
+
+        Args:
+            api: The OpenAPIClient the client belongs to
+            coalesce_requests: Share one response between identical GET/HEAD calls made
+                while the first of them is still in flight
+            **kwargs: Options for httpx.AsyncClient
+        """
         super().__init__(api)
-        self.session = api.httpx_async_client or httpx.AsyncClient(**kwargs)
+        # In-flight idempotent requests keyed by their request parts, None when disabled
+        self._inflight = {} if coalesce_requests else None
+        self._owns_session = api.httpx_async_client is None
+        self.session = api.httpx_async_client or httpx.AsyncClient(
+            **build_session_options(SESSION_DEFAULTS, kwargs, httpx.AsyncHTTPTransport)
+        )
 
     async def __aenter__(self):
         """Enter async context manager and initialize the client"""
         if not self.api.definition:
-            await self.api._load_definition_async()
+            # Fetch the definition with the operation session to reuse its connection
+            await self.api._load_definition_async(self.session)
 
         self.setup_base_url()
-        # Generate methods directly on this instance
+        # Generate the operation methods for this instance
         self.api._generate_client_methods(self, is_async=True)
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Exit async context manager and close resources"""
+        await self.aclose()
+
+    async def aclose(self):
+        """Close the HTTP session, for clients created with OpenAPIClient.abuild()"""
         if self.session:
             await self.session.aclose()
 
+    async def batch(self, calls, max_concurrency=10):
+        """
+        Call several operations concurrently.
+
+        Args:
+            calls: Iterable of (operation_name, kwargs) pairs
+            max_concurrency: Maximum number of requests in flight at once
+
+        Returns:
+            list: The responses, in the same order as calls
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def call_one(name, kwargs):
+            async with semaphore:
+                return await self(name, **kwargs)
+
+        return await asyncio.gather(*[call_one(name, kwargs) for name, kwargs in calls])
+
+    async def _coalesce(self, key, send):
+        """
+        Await the in-flight request with the same key, or start it with send().
+
+        Args:
+            key: Hashable request key
+            send: Coroutine function performing the request
+
+        Returns:
+            APIResponse: The response shared by every caller with this key
+        """
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(send())
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # A cancelled caller must not cancel the request the other callers wait for
+        return await asyncio.shield(future)
+
+
+# Patterns used by sanitize_openapi_path, compiled once
+_PATH_PARAM_RE = re.compile(r"\{([^}]*)\}")
+_NON_IDENTIFIER_RE = re.compile(r"[^0-9A-Za-z_]")
+_UNDERSCORES_RE = re.compile(r"_+")
+
 
 def sanitize_openapi_path(path: str) -> str:
     """
@@ -123,21 +408,172 @@ def sanitize_openapi_path(path: str) -> str:
     def repl_param(m):
         name = m.group(1) or ""
         # sanitize param name: replace non-alnum/_ with underscore and collapse
-        name = re.sub(r"[^0-9A-Za-z_]", "_", name)
-        name = re.sub(r"_+", "_", name).strip("_")
+        name = _NON_IDENTIFIER_RE.sub("_", name)
+        name = _UNDERSCORES_RE.sub("_", name).strip("_")
         return "by_" + name
 
-    s = re.sub(r"\{([^}]*)\}", repl_param, path)
-    # replace slashes/backslashes with underscore
-    s = re.sub(r"[\\/]+", "_", s)
-    # replace any remaining non-alnum/_ with underscore
-    s = re.sub(r"[^0-9A-Za-z_]", "_", s)
+    s = _PATH_PARAM_RE.sub(repl_param, path)
+    # replace slashes and any other non-alnum/_ with underscore
+    s = _NON_IDENTIFIER_RE.sub("_", s)
     # collapse underscores and strip edges
-    s = re.sub(r"_+", "_", s).strip("_")
+    s = _UNDERSCORES_RE.sub("_", s).strip("_")
 
     return s
 
 
+def build_operation_signature(parameters, has_body):
+    """
+    Build an inspect.Signature describing how an operation method can be called.
+
+    Path parameters come first, then query parameters, matching the order in which
+    positional arguments are consumed. Names that are not valid identifiers can
+    still be passed through **kwargs.
+    """
+    Parameter = inspect.Parameter
+    params = []
+    seen = {'headers', 'body', 'kwargs'}
+    has_default = False
+    for location in ('path', 'query'):
+        for param in parameters:
+            name = param.get('name')
+            if param.get('in') != location or not name or not name.isidentifier() or keyword.iskeyword(name):
+                continue
+            if name in seen:
+                continue
+            seen.add(name)
+            # A required parameter can not follow an optional one in a signature
+            has_default = has_default or not param.get('required', False)
+            params.append(Parameter(name, Parameter.POSITIONAL_OR_KEYWORD, default=None if has_default else Parameter.empty))
+
+    params.append(Parameter('headers', Parameter.KEYWORD_ONLY, default=None))
+    if has_body:
+        params.append(Parameter('body', Parameter.KEYWORD_ONLY, default=None))
+    params.append(Parameter('kwargs', Parameter.VAR_KEYWORD))
+    return inspect.Signature(params)
+
+
+# Marks a parameter for which no positional argument is left
+_MISSING = object()
+
+# Matches a {placeholder} in a path template
+_PATH_TEMPLATE_RE = re.compile(r"\{([^{}]*)\}")
+
+# Characters left unencoded in path parameter values: the RFC 3986 pchar characters allowed
+# within a single segment. "/" is encoded, so a value cannot add segments such as "../"
+PATH_SAFE_CHARS = "!$&'()*+,;=:@"
+
+# Characters left unencoded in cookie parameter values: the RFC 6265 cookie-octets
+COOKIE_SAFE_CHARS = "!#$&'()*+-./:<=>?@[]^_`{|}~"
+
+
+def merge_cookie_header(session, headers, request_cookies, url, cookies):
+    """
+    Build the Cookie header of a request that has cookie parameters.
+
+    A request with a Cookie header gets no cookies added by httpx, so the cookies it
+    would have sent are merged in here: the given Cookie header, or else the session's,
+    followed by the matching session and per-request cookies.
+
+    Args:
+        session: The httpx client sending the request
+        headers: The request headers, a Cookie header is removed from them
+        request_cookies: Cookies given for this request, or None
+        url: The request URL
+        cookies: The encoded "name=value" cookie parameters
+
+    Returns:
+        str: The Cookie header value
+    """
+    parts = [headers.pop(key) for key in [key for key in headers if key.lower() == 'cookie']]
+    if not parts and 'Cookie' in session.headers:
+        parts.append(session.headers['Cookie'])
+
+    jar = session.cookies
+    if request_cookies:
+        jar = httpx.Cookies(jar)
+        jar.update(request_cookies)
+    if jar:
+        # Let the cookie jar pick the cookies that apply to the URL, which may be relative
+        # to the session's base URL
+        probe = httpx.Request('GET', session.build_request('GET', url).url)
+        jar.set_cookie_header(probe)
+        if 'Cookie' in probe.headers:
+            parts.append(probe.headers['Cookie'])
+
+    parts.extend(cookies)
+    return '; '.join(parts)
+
+
+def _escape_braces(text):
+    """Escape literal braces for str.format"""
+    return text.replace('{', '{{').replace('}', '}}')
+
+
+def compile_url_template(url, path_names):
+    """
+    Compile a URL template into a str.format string with positional fields.
+
+    Placeholders of the given path parameters become positional fields and all
+    other braces are escaped, so parameter names need not be valid format fields.
+
+    Args:
+        url: The URL template, e.g. "https://example.com/pets/{petId}"
+        path_names: Names of the operation's path parameters
+
+    Returns:
+        tuple: (format string, parameter name of each positional field)
+    """
+    parts = []
+    fields = []
+    position = 0
+    for match in _PATH_TEMPLATE_RE.finditer(url):
+        parts.append(_escape_braces(url[position:match.start()]))
+        name = match.group(1)
+        if name in path_names:
+            parts.append('{%d}' % len(fields))
+            fields.append(name)
+        else:
+            parts.append(_escape_braces(match.group(0)))
+        position = match.end()
+    parts.append(_escape_braces(url[position:]))
+    return ''.join(parts), tuple(fields)
+
+
+# HTTP methods whose identical in-flight calls may share one response
+COALESCE_METHODS = frozenset(('get', 'head'))
+
+# Standard HTTP methods in OpenAPI path items
+HTTP_METHODS = frozenset(('get', 'post', 'put', 'delete', 'patch', 'options', 'head'))
+
+# Keyword arguments of an operation call that are forwarded to httpx as request options
+HTTPX_REQUEST_OPTIONS = frozenset(('auth', 'cookies', 'extensions', 'files', 'follow_redirects', 'timeout'))
+
+# Request body content types used for tool parameters, in order of preference
+TOOL_BODY_CONTENT_TYPES = ('application/json', 'application/xml', 'application/x-www-form-urlencoded')
+
+# Parameter schema keywords copied into tool parameter definitions
+TOOL_PARAMETER_SCHEMA_KEYS = ('format', 'enum', 'example')
+
+# Definition cache entries as JSON bytes, already read or written by this process, keyed by cache file
+_DEFINITION_CACHE = {}
+
+# Pickled definitions of local YAML files keyed by absolute path, with the (mtime, size) they
+# were parsed at. JSON parses about as fast as it unpickles, so it is not cached
+_FILE_DEFINITION_CACHE = {}
+
+# Number of YAML definitions kept in _FILE_DEFINITION_CACHE, the least recently used are dropped
+FILE_DEFINITION_CACHE_SIZE = 8
+
+# File name suffixes of YAML definitions
+YAML_SUFFIXES = ('.yaml', '.yml')
+
+# Accept header for fetching a definition, JSON is preferred over YAML
+DEFINITION_ACCEPT = 'application/json, application/yaml;q=0.5, */*;q=0.1'
+
+# Default directory for cached OpenAPI definitions loaded from a URL
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'openapiclient')
+
+
 def resolve_open_api_reference(dct, definition):
     if "$ref" not in dct:
         return dct
@@ -176,12 +612,15 @@ class OpenAPIClient:
             result = await client.operation_name(param1=value)
     """
 
-    def __init__(self, definition=None, httpx_client=None, httpx_async_client=None):
+    def __init__(self, definition=None, httpx_client=None, httpx_async_client=None, cache_dir=DEFAULT_CACHE_DIR,
+                 http_kwargs=None):
         """
         Initialize the OpenAPI client.
 
         Args:
             definition: URL or file path to the OpenAPI definition, or a dictionary containing the definition
+            cache_dir: Directory used to cache definitions loaded from a URL, or None to disable caching
+            http_kwargs: Default httpx client options for every Client/AsyncClient created by this instance
         """
         self.definition_source = definition
         self.definition = {}
@@ -189,326 +628,675 @@ class OpenAPIClient:
         self.source_url = None  # Store the source URL if loaded from a URL
         self.httpx_client = httpx_client
         self.httpx_async_client = httpx_async_client
+        self.cache_dir = cache_dir
+        self.http_kwargs = http_kwargs or {}
+        self._operations = None
+        self._operation_index = None
+        # Schema references of the definition and their resolved schemas, see _build_tools
+        self._schema_references = None
+        self._ref_cache = {}
+        # CompiledOperation per (method, path), valid for _compiled_base_url
+        self._compiled = {}
+        self._compiled_base_url = None
 
     def Client(self, **kwargs):
         """
         Create a synchronous client instance that can be used as a context manager.
         
         Args:
-            **kwargs: Additional arguments to pass to httpx.Client
+            **kwargs: Additional arguments to pass to httpx.Client, merged over http_kwargs.
+                'retries' sets how often failed connection attempts are retried,
+                'pool_limits' overrides the connection pool limits.
             
         Returns:
             Client: A synchronous client
         """
-        return Client(self, **kwargs)
+        return Client(self, **{**self.http_kwargs, **kwargs})
 
     def AsyncClient(self, **kwargs):
         """
         Create an asynchronous client instance that can be used as a context manager.
         
         Args:
-            **kwargs: Additional arguments to pass to httpx.AsyncClient
+            **kwargs: Additional arguments to pass to httpx.AsyncClient, merged over http_kwargs.
+                'retries' sets how often failed connection attempts are retried,
+                'pool_limits' overrides the connection pool limits.
             
         Returns:
             AsyncClient: An asynchronous client
         """
-        return AsyncClient(self, **kwargs)
+        return AsyncClient(self, **{**self.http_kwargs, **kwargs})
+
+    def build(self, **kwargs):
+        """
+        Create a ready to use synchronous client without a with block.
+
+        The client keeps its session open, so it can be reused for the lifetime of the
+        process instead of being entered for every few calls. Call close() when done.
+
+        Args:
+            **kwargs: Same as for Client()
+
+        Returns:
+            Client: An initialized synchronous client
+        """
+        return self.Client(**kwargs).__enter__()
+
+    async def abuild(self, **kwargs):
+        """
+        Create a ready to use asynchronous client without an async with block.
+
+        See build(), call aclose() when done.
+
+        Args:
+            **kwargs: Same as for AsyncClient()
+
+        Returns:
+            AsyncClient: An initialized asynchronous client
+        """
+        return await self.AsyncClient(**kwargs).__aenter__()
 
     def _process_file_definition(self):
-        """Process definition from a file source"""
-        with open(self.definition_source, 'r') as f:
-            content = f.read()
-            if self.definition_source.endswith('.yaml') or self.definition_source.endswith('.yml'):
-                self.definition = yaml.safe_load(content)
-            else:
-                self.definition = json.loads(content)
+        """Process definition from a file source, reusing the parse of an unchanged YAML file"""
+        path = os.path.abspath(self.definition_source)
+        if not path.endswith(YAML_SUFFIXES):
+            # Read raw bytes, orjson decodes them without a str copy
+            with open(path, 'rb') as f:
+                self.definition = _json_loads(f.read())
+            return
+
+        stat = os.stat(path)
+        version = (stat.st_mtime_ns, stat.st_size)
+        cached = _FILE_DEFINITION_CACHE.pop(path, None)
+        if cached and cached[0] == version:
+            # Reinsert to mark the entry as most recently used
+            _FILE_DEFINITION_CACHE[path] = cached
+            self.definition = pickle.loads(cached[1])
+            return
+
+        # The YAML loader decodes the raw bytes itself
+        with open(path, 'rb') as f:
+            self.definition = yaml.load(f.read(), Loader=_YamlLoader)
+        _FILE_DEFINITION_CACHE[path] = (version, pickle.dumps(self.definition, protocol=pickle.HIGHEST_PROTOCOL))
+        while len(_FILE_DEFINITION_CACHE) > FILE_DEFINITION_CACHE_SIZE:
+            del _FILE_DEFINITION_CACHE[next(iter(_FILE_DEFINITION_CACHE))]
 
     def _process_definition_response(self, response):
         """Process HTTP response and extract OpenAPI definition"""
         content_type = response.headers.get('Content-Type', '')
+        # The YAML loader decodes the raw bytes itself, so skip httpx's text decoding
         if 'yaml' in content_type or 'yml' in content_type:
-            self.definition = yaml.safe_load(response.text)
-        elif self.definition_source.endswith('.yaml') or self.definition_source.endswith('.yml'):
-            self.definition = yaml.safe_load(response.text)
+            self.definition = yaml.load(response.content, Loader=_YamlLoader)
+            return
+        try:
+            # JSON parses much faster than YAML, so try it first unless the server said YAML.
+            # Decode the raw bytes directly, with orjson when it is installed
+            self.definition = _json_loads(response.content)
+        except ValueError:
+            if not self.definition_source.endswith(YAML_SUFFIXES):
+                raise
+            self.definition = yaml.load(response.content, Loader=_YamlLoader)
+
+    def _cache_path(self):
+        """Return the cache file for the definition URL, or None if caching is disabled"""
+        if not self.cache_dir:
+            return None
+        key = hashlib.sha256(self.definition_source.encode()).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _read_cache(self):
+        """Read the cached definition entry for the definition URL, if any"""
+        path = self._cache_path()
+        if not path:
+            return None
+        try:
+            # Entries are kept serialized in memory too, so every load gets its own copy
+            content = _DEFINITION_CACHE.get(path)
+            if content is None:
+                if not os.path.isfile(path):
+                    return None
+                with open(path, 'rb') as f:
+                    content = f.read()
+                _DEFINITION_CACHE[path] = content
+            cached = _json_loads(content)
+        except Exception:
+            # A corrupt or incompatible cache entry is simply ignored
+            return None
+        return cached if isinstance(cached, dict) and isinstance(cached.get('data'), dict) else None
+
+    def _write_cache(self, response):
+        """Store the parsed definition together with the response validators"""
+        path = self._cache_path()
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        # Without validators the cached entry could never be revalidated
+        if not path or not (etag or last_modified):
+            return
+        try:
+            # Stored as JSON rather than pickle, so reading a cache file can never run code
+            content = _json_dumps({
+                'etag': etag,
+                'last_modified': last_modified,
+                'data': self.definition,
+            })
+        except (TypeError, ValueError):
+            # YAML definitions may hold values JSON cannot represent, these are not cached
+            return
+        _DEFINITION_CACHE[path] = content
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Write to a temporary file first so readers never see a partial entry
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(content)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError:
+            pass
+
+    @staticmethod
+    def _conditional_headers(cached):
+        """Build the definition request headers, conditional on a cached definition entry"""
+        # Servers that can serve both formats are asked for the faster to parse JSON
+        headers = {'Accept': DEFINITION_ACCEPT}
+        if cached:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+        return headers
+
+    def _handle_definition_response(self, response, cached):
+        """Use the cached definition on 304, otherwise parse and cache the response"""
+        if response.status_code == 304 and cached:
+            self.definition = cached['data']
+        elif response.status_code == 200:
+            self._process_definition_response(response)
+            self._write_cache(response)
         else:
-            self.definition = response.json()
+            raise Exception(f"Failed to load OpenAPI definition: {response.status_code}")
 
-    async def _load_definition_async(self):
-        """Load the OpenAPI definition asynchronously"""
+    def _load_local_definition(self):
+        """
+        Load the definition when no HTTP request is needed.
+
+        Shared by the sync and async loaders, which only differ in how a URL is fetched.
+
+        Returns:
+            bool: True if the definition is loaded, False if it has to be fetched from a URL
+        """
         # Check if definition is already loaded
         if self.definition:
-            return
+            return True
 
         if isinstance(self.definition_source, dict):
             self.definition = self.definition_source
-            return
+            return True
 
-        if os.path.isfile(str(self.definition_source)):
+        source = str(self.definition_source)
+        # A URL is never a local file, so skip the stat call for it
+        if '://' not in source and os.path.isfile(source):
             # Load from file
             self._process_file_definition()
-            return
+            return True
 
         # Assume it's a URL
         self.source_url = self.definition_source  # Store the source URL
-        async with httpx.AsyncClient() as client:
-            response = await client.get(self.definition_source)
-            if response.status_code == 200:
-                self._process_definition_response(response)
-            else:
-                raise Exception(f"Failed to load OpenAPI definition: {response.status_code}")
+        return False
 
-    def _load_definition_sync(self):
-        """Load the OpenAPI definition synchronously"""
-        # Check if definition is already loaded
-        if self.definition:
-            return
+    async def _load_definition_async(self, client=None):
+        """
+        Load the OpenAPI definition asynchronously
 
-        if isinstance(self.definition_source, dict):
-            self.definition = self.definition_source
+        Args:
+            client: Optional httpx.AsyncClient used to fetch a URL definition, so its
+                connection can be reused for the API calls that follow
+        """
+        if self._load_local_definition():
             return
 
-        if os.path.isfile(str(self.definition_source)):
-            # Load from file
-            self._process_file_definition()
+        cached = self._read_cache()
+        headers = self._conditional_headers(cached)
+        if client is None:
+            # Clients pass their own session, this is only for direct calls
+            async with httpx.AsyncClient() as client:
+                response = await client.get(self.definition_source, headers=headers)
+        else:
+            response = await client.get(self.definition_source, headers=headers)
+        self._handle_definition_response(response, cached)
+
+    def _load_definition_sync(self, client=None):
+        """
+        Load the OpenAPI definition synchronously
+
+        Args:
+            client: Optional httpx.Client used to fetch a URL definition, so its
+                connection can be reused for the API calls that follow
+        """
+        if self._load_local_definition():
             return
 
-        # Assume it's a URL
-        self.source_url = self.definition_source  # Store the source URL
-        with httpx.Client() as client:
-            response = client.get(self.definition_source)
-            if response.status_code == 200:
-                self._process_definition_response(response)
-            else:
-                raise Exception(f"Failed to load OpenAPI definition: {response.status_code}")
+        cached = self._read_cache()
+        headers = self._conditional_headers(cached)
+        if client is None:
+            # Clients pass their own session, this is only for direct calls
+            with httpx.Client() as client:
+                response = client.get(self.definition_source, headers=headers)
+        else:
+            response = client.get(self.definition_source, headers=headers)
+        self._handle_definition_response(response, cached)
 
     def get_operations(self):
         """
         Extract all operations from the OpenAPI definition.
 
+        The operations are extracted once and reused by every client entered afterwards.
+
         Returns:
-            list: A list of operation objects with normalized properties.
+            list: A list of Operation tuples with normalized properties.
         """
+        if self._operations is not None:
+            return list(self._operations)
+
         # Get all paths from the definition or empty dict if not available
         paths = self.definition.get('paths', {})
-        # List of standard HTTP methods in OpenAPI
-        http_methods = ['get', 'post', 'put', 'delete', 'patch', 'options', 'head']
         operations = []
 
+        # Definition-level security applies to every operation that does not set its own
+        security = self.definition.get('security')
+
         # Iterate through each path
         for path, path_object in paths.items():
-            # For each HTTP method in the path
-            for method in http_methods:
-                operation = path_object.get(method)
-                # Skip if this method doesn't exist for this path
-                if not operation:
+            # Path-level values are shared by all methods of the path
+            path_parameters = path_object.get('parameters')
+            path_servers = path_object.get('servers')
+
+            # For each HTTP method in the path, in the order of the definition
+            for method, operation in path_object.items():
+                # Skip other path item fields and empty operations
+                if method not in HTTP_METHODS or not operation:
                     continue
 
-                # Create operation object with basic properties
-                op = operation.copy() if isinstance(operation, dict) else {}
-                op['path'] = path
-                op['method'] = method
+                if not isinstance(operation, dict):
+                    operation = {}
+
+                operations.append(Operation(
+                    operation_id=operation.get('operationId') or method + "_" + sanitize_openapi_path(path),
+                    path=path,
+                    method=method,
+                    # Add path-level parameters and servers if they exist
+                    parameters=(operation.get('parameters') or []) + (path_parameters or []),
+                    request_body=operation.get('requestBody'),
+                    servers=(operation.get('servers') or []) + (path_servers or []),
+                    # Set security from definition if not specified in operation
+                    security=operation.get('security', security),
+                    summary=operation.get('summary', ''),
+                    description=operation.get('description', ''),
+                ))
 
-                # Add path-level parameters if they exist
-                if 'parameters' in path_object:
-                    op['parameters'] = (op.get('parameters', []) + path_object['parameters'])
+        if self.definition:
+            # Nothing to cache before the definition is loaded
+            self._operations = tuple(operations)
+        return operations
+
+    def get_operation(self, operation_id):
+        """
+        Look up an operation by its operationId.
 
-                # Add path-level servers if they exist
-                if 'servers' in path_object:
-                    op['servers'] = (op.get('servers', []) + path_object['servers'])
+        Args:
+            operation_id: The operationId, or the generated name of an operation without one
+
+        Returns:
+            Operation: The operation, or None if there is no such operation
+        """
+        return self._get_operation_index().get(operation_id)
+
+    def _get_operation_index(self):
+        """Return the operations keyed by operation id, built once and shared by every client"""
+        index = self._operation_index
+        if index is None:
+            # Later operations with the same id win, like for client methods
+            index = {operation.operation_id: operation for operation in self.get_operations()}
+            if self.definition:
+                self._operation_index = index
+        return index
+
+    def resolve_schema_ref(self, schema, all_references, memo=None):
+        """
+        Resolve schema references to their actual schema.
 
-                # Set security from definition if not specified in operation
-                if 'security' not in op and 'security' in self.definition:
-                    op['security'] = self.definition['security']
+        The input schemas are never modified. Only schemas containing a reference are
+        copied, all others are returned as they are and so are shared with the definition. Nested
+        schemas are walked with an explicit stack instead of recursion, a reference that
+        occurs again inside its own schema is kept as {"$ref": ...}.
 
-                operations.append(op)
+        Args:
+            schema: The schema to resolve
+            all_references: Mapping of reference paths to schemas
+            memo: Resolved schemas and the references they expand, keyed by reference path,
+                shared between calls
 
-        return operations
+        Returns:
+            dict: The resolved schema
+        """
+        if memo is None:
+            memo = {}
+
+        # References being resolved on the current path. The stack is walked depth first,
+        # so a single set is kept up to date by adding and discarding around each schema
+        seen = set()
+
+        def resolve(node, cuts, refs):
+            """
+            Resolve one schema, yielding child schemas and receiving their resolved schema.
+
+            References of enclosing schemas at which a cycle was cut are added to cuts, every
+            reference expanded inside the schema is added to refs.
+            """
+            chain = []
+            try:
+                while '$ref' in node:
+                    ref = node['$ref']
+                    if ref in seen:
+                        # Cut the reference cycle
+                        cuts.add(ref)
+                        return {'$ref': ref}
+                    cached = memo.get(ref)
+                    # A memoized schema is only reused where none of its references is being
+                    # resolved, anywhere else the cycle would have been cut inside it
+                    if cached is not None and seen.isdisjoint(cached[1]):
+                        node = cached[0]
+                        refs.update(cached[1])
+                        break
+                    chain.append(ref)
+                    seen.add(ref)
+                    node = all_references.get(ref, {})
+                else:
+                    schema_type = node.get('type')
+                    if schema_type == 'object' and 'properties' in node:
+                        properties = {}
+                        changed = False
+                        for name, value in node['properties'].items():
+                            resolved = yield value
+                            properties[name] = resolved
+                            changed = changed or resolved is not value
+                        # Copy on write, a schema without references is used as it is
+                        if changed:
+                            node = {**node, 'properties': properties}
+                    elif schema_type == 'array':
+                        items = node.get('items')
+                        resolved = yield items or {}
+                        if resolved is not items:
+                            node = {**node, 'items': resolved}
+
+                refs.update(chain)
+                cuts.difference_update(chain)
+                # A schema that cut a cycle at an enclosing reference depends on where it was
+                # resolved, so only schemas that are complete on their own are shared
+                if not cuts:
+                    cached = (node, frozenset(refs))
+                    for ref in chain:
+                        memo[ref] = cached
+                return node
+            finally:
+                seen.difference_update(chain)
+
+        cuts, refs = set(), set()
+        stack = [(resolve(schema, cuts, refs), cuts, refs)]
+        value = None
+        while stack:
+            frame, cuts, refs = stack[-1]
+            try:
+                child = frame.send(value)
+            except StopIteration as stop:
+                stack.pop()
+                value = stop.value
+                if stack:
+                    stack[-1][1].update(cuts)
+                    stack[-1][2].update(refs)
+            else:
+                cuts, refs = set(), set()
+                stack.append((resolve(child, cuts, refs), cuts, refs))
+                value = None
+        return value
 
-    def resolve_schema_ref(self, schema, all_references):
-        """Resolve schema references to their actual schema"""
-        if '$ref' in schema:
-            schema = all_references.get(schema['$ref'], {})
-        elif schema.get('type') == 'object':
-            for key, value in schema.get('properties', {}).items():
-                schema['properties'][key] = self.resolve_schema_ref(value, all_references)
-        elif schema.get('type') == 'array':
-            schema['items'] = self.resolve_schema_ref(schema.get('items', {}), all_references)
-        return schema
-
-    def create_tool(self, operation_id, operation, all_references):
-        """Create an AI tool description from operation data"""
+    def create_tool(self, operation_id, operation, all_references, memo=None):
+        """Create an AI tool description from operation data, see resolve_schema_ref for memo"""
         # Get parameters from the request body schema
-        body = operation.get('requestBody', {})
-        content = body.get('content', {})
-        schema = content.get('application/json', {}).get('schema', {}) or content.get('application/xml', {}).get('schema', {}) or content.get('application/x-www-form-urlencoded', {}).get('schema', {})
-        json_schema = self.resolve_schema_ref(schema, all_references) if schema else { "type": "object", "properties": {} }
+        body = operation.request_body or {}
+        content = body.get('content') or {}
+        schema = None
+        for content_type in TOOL_BODY_CONTENT_TYPES:
+            schema = (content.get(content_type) or {}).get('schema')
+            if schema:
+                break
+        json_schema = self.resolve_schema_ref(schema, all_references, memo) if schema else { "type": "object", "properties": {} }
+        # Resolved schemas are shared through the memo, so only change a copy
+        json_schema = dict(json_schema)
 
         if not json_schema.get('description'):
             json_schema['description'] = body.get('description', '')
 
         # add parameters from path and query
-        parameters = operation.get('parameters', [])
-        if len(parameters) > 0:
-            if not json_schema.get('required'):
-                json_schema['required'] = []
-            if not json_schema.get('properties'):
-                json_schema['properties'] = {}
+        parameters = operation.parameters
+        if parameters:
+            required = list(json_schema.get('required') or [])
+            properties = dict(json_schema.get('properties') or {})
+            json_schema['required'] = required
+            json_schema['properties'] = properties
             for parameter in parameters:
+                parameter = resolve_open_api_reference(parameter, self.definition)
                 name = parameter.get('name')
                 if parameter.get('required', False):
-                    json_schema["required"].append(name)
+                    required.append(name)
 
-                parameter_schema = {
-                    "type": parameter.get('schema', {}).get('type', 'string'),
+                parameter_schema = parameter.get('schema') or {}
+                item = {
+                    "type": parameter_schema.get('type', 'string'),
                     "description": parameter.get('description', ''),
                 }
                 # Add format, enum, and example if available
-                for key in ['format', 'enum', 'example']:
-                    if parameter.get('schema', {}).get(key):
-                        parameter_schema[key] = parameter.get('schema', {}).get(key)
-                json_schema["properties"][name] = parameter_schema
+                for key in TOOL_PARAMETER_SCHEMA_KEYS:
+                    value = parameter_schema.get(key)
+                    if value is not None:
+                        item[key] = value
+                properties[name] = item
 
         return {
             "type": "function",
             "function": {
                 "name": operation_id,
-                "description": operation.get('summary', '') or operation.get('description', ''),
+                "description": operation.summary or operation.description,
                 "parameters": json_schema,
             }
         }
 
+    def _build_tools(self, operations):
+        """
+        Build the AI tool definitions for the given operations.
+
+        Args:
+            operations: List of (operation_id, operation) pairs
+
+        Returns:
+            list: Tool definitions, in the same order as operations
+        """
+        # Set up references dictionary, once per instance
+        if self._schema_references is None:
+            self._schema_references = {f'#/components/schemas/{name}': schema for name, schema in
+                                       self.definition.get('components', {}).get('schemas', {}).items()}
+
+        # References are resolved on demand while building each tool, so only schemas
+        # reachable from an operation are walked. The resolved schemas are kept on the
+        # instance, so each reference is resolved once for all tools built from it
+        return [self.create_tool(operation_id, operation, self._schema_references, self._ref_cache)
+                for operation_id, operation in operations]
+
     def _generate_client_methods(self, client_instance, is_async=False):
         """
-        Generate methods directly on the client instance from the OpenAPI spec.
+        Set up the operations of the client instance from the OpenAPI spec.
+
+        The operation methods are created on first use, see BaseClient._get_method, so
+        entering a client for a large spec does not build thousands of unused closures.
+        Tool definitions are not built here either, see BaseClient.tools.
 
         Args:
             client_instance: The client instance to add methods to
             is_async: Whether to create async or sync methods
         """
-        # Set up references dictionary
-        all_references = {f'#/components/schemas/{name}': schema for name, schema in 
-                        self.definition.get('components', {}).get('schemas', {}).items()}
+        if self._compiled_base_url != self.base_url:
+            # The URL templates are joined with the base URL, so they are stale now
+            self._compiled = {}
+            self._compiled_base_url = self.base_url
 
-        # Resolve all references
-        for name, schema in all_references.items():
-            schema = self.resolve_schema_ref(schema, all_references)
-            all_references[name] = schema
-
-        # Create methods, paths and tools
-        paths, tools = [], []
+        # Collect the operations, their methods are only created when first used
+        paths = []
         operations_list = []
+        operations_raw = []
 
         for operation in self.get_operations():
-            operation_id = operation.get('operationId')
-            if not operation_id:
-                operation_id = (
-                    operation["method"] + "_" + sanitize_openapi_path(operation["path"])
-                )
-
-            path = operation.get('path')
-            paths.append(path)
+            paths.append(operation.path)
+            operations_list.append(operation.operation_id)
+            operations_raw.append((operation.operation_id, operation))
+
+        # Set the client attributes, the operation map is the shared index and only read
+        client_instance._methods = {}
+        client_instance._operation_map = self._get_operation_index()
+        client_instance._is_async = is_async
+        client_instance._operations_raw = operations_raw
+        client_instance.operations = operations_list
+        client_instance.paths = paths
+        # Drop tools and functions built before the operations were known
+        client_instance.__dict__.pop('tools', None)
+        client_instance.__dict__.pop('tools_json', None)
+        client_instance.__dict__.pop('functions', None)
 
-            # Create and attach the method to the client instance
-            method_obj = self._create_operation_method(
-                client_instance, 
-                path, 
-                operation.get('method'), 
-                operation, 
-                is_async
-            )
+    def _process_response(self, response):
+        """
+        Process response and return a standardized format.
 
-            # Set the method on the client instance
-            setattr(client_instance, operation_id, method_obj)
-            operations_list.append(operation_id)
+        Args:
+            response: HTTP response
 
-            # Create tool definition
-            tools.append(self.create_tool(operation_id, operation, all_references))
+        Returns:
+            APIResponse: Formatted response object
+        """
+        content = response.content
+        # Media types are case-insensitive, and structured syntax suffixes like
+        # application/problem+json are JSON as well
+        content_type = response.headers.get('Content-Type', '').lower()
+        if content and ('application/json' in content_type or '+json' in content_type):
+            # Decode the raw bytes directly, with orjson when it is installed
+            result = _json_loads(content)
+        else:
+            result = response.text
 
-        # Set the client attributes
-        client_instance.operations = operations_list
-        client_instance.paths = paths
-        client_instance.tools = tools
+        # Create response object similar to axios, the headers are not copied
+        return APIResponse(result, response.status_code, response.headers, {})
 
-    def _prepare_request_params(self, path, operation, args, kwargs):
+    def resolve_server_url(self, server_url):
         """
-        Prepare request parameters for an API operation.
+        Make a server URL absolute, relative URLs are resolved against the definition URL.
 
         Args:
-            path: The path template
-            operation: Operation object
-            args: Positional arguments passed to the operation
-            kwargs: Keyword arguments passed to the operation
+            server_url: The url of a server object
 
         Returns:
-            tuple: (full_url, query_params, body, headers, remaining_kwargs)
+            str: The server URL
         """
-        # Process path parameters
-        url = path
-        path_params = {}
+        parsed_url = urlparse(server_url)
 
-        # Extract parameters from operation definition
-        parameters = operation.get('parameters', [])
-        for param in parameters:
-            param = resolve_open_api_reference(param, self.definition)
-            if param.get('in') == 'path':
-                name = param.get('name')
-                if name in kwargs:
-                    path_params[name] = kwargs.pop(name)
-                elif len(args) > 0:
-                    path_params[name] = args.pop(0)  # Pop the first positional argument
-
-        # Replace path parameters in the URL
-        for name, value in path_params.items():
-            url = url.replace(f"{{{name}}}", str(value))
-
-        # Build the full URL
-        full_url = urljoin(self.base_url, url)
-
-        # Handle query parameters
-        query_params = {}
-        for param in parameters:
-            param = resolve_open_api_reference(param, self.definition)
-            if param.get('in') == 'query':
-                name = param.get('name')
-                if name in kwargs:
-                    query_params[name] = kwargs.pop(name)
-                elif len(args) > 0:
-                    query_params[name] = args.pop(0)  # Pop the first positional argument
-
-        # Handle headers
-        headers = kwargs.pop('headers', {})
-
-        # Handle request body
-        body = kwargs.pop('data', None) or kwargs.pop('body', None)
-        # json body
-        if not body and len(kwargs) > 0 and operation.get('requestBody', {}).get('content', {}):
-            body = kwargs.copy()
-            kwargs.clear()  # Clear the kwargs after using them as body
-
-        return full_url, query_params, body, headers, kwargs
+        if parsed_url.scheme or not self.source_url:
+            return server_url
+        source_parsed = urlparse(self.source_url)
+        base = f"{source_parsed.scheme}://{source_parsed.netloc}"
+        return urljoin(base, server_url)
 
-    def _process_response(self, response):
+    def _body_property_names(self, request_body):
         """
-        Process response and return a standardized format.
+        Collect the top-level property names of a request body, for every content type.
 
         Args:
-            response: HTTP response
+            request_body: The resolved request body object
 
         Returns:
-            dict: Formatted response object
+            frozenset: The property names
         """
-        if 'application/json' in response.headers.get('Content-Type', ''):
-            result = response.json()
-        else:
-            result = response.text
+        def resolve(schema):
+            """Follow a $ref chain, stopping at cycles and references that can not be resolved"""
+            seen = set()
+            while '$ref' in schema and schema['$ref'] not in seen:
+                seen.add(schema['$ref'])
+                try:
+                    schema = resolve_open_api_reference(schema, self.definition)
+                except (NotImplementedError, ValueError):
+                    return {}
+            return schema
+
+        names = set()
+        for media_type in request_body.get('content', {}).values():
+            schema = resolve((media_type or {}).get('schema') or {})
+            # Composed schemas contribute the properties of their parts
+            for part in [schema, *schema.get('allOf', []), *schema.get('oneOf', []), *schema.get('anyOf', [])]:
+                names.update(resolve(part).get('properties') or ())
+        return frozenset(names)
+
+    def _compile_operation(self, operation):
+        """
+        Compute the call metadata of an operation, once per OpenAPIClient.
 
-        # Create response object similar to axios
-        return {
-            'data': result,
-            'status': response.status_code,
-            'headers': dict(response.headers),
-            'config': {}  # Original config dict is no longer available here
-        }
+        Only the closures of _create_operation_method are built per client, everything
+        that depends on the definition alone is computed here and reused.
+
+        Args:
+            operation: The Operation tuple
+
+        Returns:
+            CompiledOperation: The call metadata
+        """
+        key = (operation.method, operation.path)
+        compiled = self._compiled.get(key)
+        if compiled is not None:
+            return compiled
+
+        # Split the parameters by location once instead of scanning them on every call
+        parameters = [resolve_open_api_reference(param, self.definition) for param in operation.parameters]
+        names_by_location = {'path': [], 'query': [], 'header': [], 'cookie': []}
+        for param in parameters:
+            names = names_by_location.get(param.get('in'))
+            if names is not None:
+                names.append(param.get('name'))
+        path_names = tuple(names_by_location['path'])
+        request_body = resolve_open_api_reference(operation.request_body or {}, self.definition)
+        has_body = bool(request_body.get('content'))
+        # A body property with the name of an httpx option, e.g. timeout, belongs to the body
+        option_names = HTTPX_REQUEST_OPTIONS - self._body_property_names(request_body) if has_body else HTTPX_REQUEST_OPTIONS
+        # Operation and path level servers override the definition's server
+        base_url = self.resolve_server_url(operation.servers[0]['url']) if operation.servers else self.base_url
+        # Paths are relative to the server URL including its path, e.g. /api/v3. The base URL
+        # is fixed once the client is set up, so the template is only built once
+        url_template = base_url.rstrip('/') + '/' + operation.path.lstrip('/')
+        url_format, url_fields = compile_url_template(url_template, path_names)
+
+        compiled = CompiledOperation(
+            path_names=path_names,
+            query_names=tuple(names_by_location['query']),
+            header_names=frozenset(names_by_location['header']),
+            cookie_names=frozenset(names_by_location['cookie']),
+            has_body=has_body,
+            option_names=option_names,
+            url_template=url_template,
+            url_format=url_format,
+            url_fields=url_fields,
+            signature=build_operation_signature(parameters, has_body),
+            # Only join the parts that exist, so operations without them get no docstring
+            doc="\n\n".join(part for part in (operation.summary, operation.description) if part) or None,
+        )
+        self._compiled[key] = compiled
+        return compiled
 
     def _create_operation_method(self, client_instance, path, method, operation, is_async=False):
         """
@@ -518,53 +1306,173 @@ class OpenAPIClient:
             client_instance: The client instance
             path: The path template
             method: The HTTP method
-            operation: The operation object
+            operation: The Operation tuple
             is_async: Whether to create an async method
             
         Returns:
             function: A method that performs the operation
         """
-        if is_async:
-            async def operation_method(*args, **kwargs):
-                # Prepare request parameters
-                full_url, query_params, body, headers, remaining_kwargs = self._prepare_request_params(
-                    path, operation, list(args), kwargs.copy()
-                )
+        compiled = self._compile_operation(operation)
+        path_names = compiled.path_names
+        query_names = compiled.query_names
+        header_names = compiled.header_names
+        cookie_names = compiled.cookie_names
+        has_body = compiled.has_body
+        option_names = compiled.option_names
+        url_template = compiled.url_template
+        url_format = compiled.url_format
+        url_fields = compiled.url_fields
+
+        def prepare_request(args, kwargs):
+            """
+            Split the call arguments into request parts, using the metadata computed above.
+
+            kwargs must be a dict owned by the call, it is consumed in place.
+
+            Returns:
+                tuple: (full_url, query_params, body, headers, options)
+            """
+            if args:
+                # Positional arguments fill the parameters in order, so walk the names
+                positional = iter(args)
+                path_params = {}
+                for name in path_names:
+                    value = kwargs.pop(name) if name in kwargs else next(positional, _MISSING)
+                    if value is not _MISSING:
+                        path_params[name] = value
+
+                query_params = {}
+                for name in query_names:
+                    value = kwargs.pop(name) if name in kwargs else next(positional, _MISSING)
+                    if value is not _MISSING:
+                        query_params[name] = value
+            else:
+                # Keyword arguments only, path parameters are split with a single set intersection.
+                # Query parameters keep their declared order so the generated URL is stable.
+                path_params = {name: kwargs.pop(name) for name in kwargs.keys() & path_names}
+                query_params = {name: kwargs.pop(name) for name in query_names if name in kwargs}
+
+            # Substitute the URL-encoded path parameters in a single pass, placeholders
+            # without a value are left as they are
+            if url_fields:
+                full_url = url_format.format(*[
+                    quote(str(path_params[name]), safe=PATH_SAFE_CHARS) if name in path_params else '{' + name + '}'
+                    for name in url_fields
+                ])
+            else:
+                full_url = url_template
+
+            # Handle headers, header and cookie parameters are sent as request headers
+            headers = kwargs.pop('headers', None) or {}
+            if header_names or cookie_names:
+                headers = dict(headers)
+                for name in kwargs.keys() & header_names:
+                    headers[name] = str(kwargs.pop(name))
+                # In the order the caller passed them, so the header is the same on every run
+                cookies = [f"{name}={quote(str(kwargs.pop(name)), safe=COOKIE_SAFE_CHARS)}"
+                           for name in [name for name in kwargs if name in cookie_names]]
+                if cookies:
+                    # httpx adds no cookies of its own to a request that has a Cookie header
+                    request_cookies = kwargs.pop('cookies', None) if 'cookies' in option_names else None
+                    headers['Cookie'] = merge_cookie_header(
+                        client_instance.session, headers, request_cookies, full_url, cookies)
+
+            # Per-request httpx options are passed through explicitly, unless the body has them
+            options = {name: kwargs.pop(name) for name in kwargs.keys() & option_names}
+
+            # Handle request body
+            body = kwargs.pop('data', None) or kwargs.pop('body', None)
+            # json body
+            if not body and kwargs and has_body:
+                # The remaining keyword arguments become the body as they are
+                body, kwargs = kwargs, {}
+
+            if kwargs:
+                raise TypeError(f"Unexpected keyword arguments: {', '.join(kwargs)}")
+
+            return full_url, query_params, body, headers, options
+
+        def prepare_plain_request(args, kwargs):
+            """
+            Fast path of prepare_request for operations without parameters or a body.
+
+            Returns:
+                tuple: (full_url, query_params, body, headers, options)
+            """
+            if not kwargs:
+                # The common call without any arguments
+                return url_template, {}, None, {}, {}
+
+            headers = kwargs.pop('headers', None) or {}
+            options = {name: kwargs.pop(name) for name in kwargs.keys() & HTTPX_REQUEST_OPTIONS}
+            body = kwargs.pop('data', None) or kwargs.pop('body', None)
+            if kwargs:
+                raise TypeError(f"Unexpected keyword arguments: {', '.join(kwargs)}")
+            return url_template, {}, body, headers, options
+
+        # Most of the per-call work does not apply to operations without parameters or a body,
+        # they use the specialized version
+        has_arguments = path_names or query_names or header_names or cookie_names or has_body
+        prepare = prepare_request if has_arguments else prepare_plain_request
+
+        # Bind the callables used on every call once, instead of looking them up per request
+        request = client_instance.session.request
+        process_response = self._process_response
 
-                # Make the async request
-                response = await client_instance.session.request(
+        if is_async:
+            async def send_request(full_url, query_params, body, headers, options):
+                # Make the async request, httpx merges in the session headers itself
+                response = await request(
                     method,
                     full_url,
                     params=query_params,
                     json=body,
-                    headers=dict(client_instance.session.headers) | headers,
-                    **remaining_kwargs,
+                    headers=headers,
+                    **options,
                 )
 
                 # Process the response
-                return self._process_response(response)
+                return process_response(response)
+
+            coalesce = client_instance._inflight is not None and method.lower() in COALESCE_METHODS
+
+            async def operation_method(*args, **kwargs):
+                # Prepare request parameters
+                prepared = prepare(args, kwargs)
+                full_url, query_params, body, headers, options = prepared
+
+                if coalesce and body is None and not options:
+                    try:
+                        key = (method, full_url, tuple(query_params.items()), tuple(headers.items()))
+                        hash(key)
+                    except TypeError:
+                        # Unhashable parameter values, e.g. lists, are sent on their own
+                        pass
+                    else:
+                        return await client_instance._coalesce(key, lambda: send_request(*prepared))
+
+                return await send_request(*prepared)
         else:
             def operation_method(*args, **kwargs):
                 # Prepare request parameters
-                full_url, query_params, body, headers, remaining_kwargs = self._prepare_request_params(
-                    path, operation, list(args), kwargs.copy()
-                )
+                full_url, query_params, body, headers, options = prepare(args, kwargs)
 
-                # Make the sync request
-                response = client_instance.session.request(
+                # Make the sync request, httpx merges in the session headers itself
+                response = request(
                     method,
                     full_url,
                     params=query_params,
                     json=body,
-                    headers=dict(client_instance.session.headers) | headers,
-                    **remaining_kwargs,
+                    headers=headers,
+                    **options,
                 )
 
                 # Process the response
-                return self._process_response(response)
+                return process_response(response)
 
         # Set method metadata
-        operation_method.__name__ = operation.get('operationId', '')
-        operation_method.__doc__ = operation.get('summary', '') + "\n\n" + operation.get('description', '')
+        operation_method.__name__ = operation.operation_id
+        operation_method.__doc__ = compiled.doc
+        operation_method.__signature__ = compiled.signature
 
         return operation_method
\ No newline at end of file
@@ -5,7 +5,7 @@ with open("README.md", "r") as fh:
 
 setup(
     name="openapi-httpx-client",
-    version="0.4.3",
+    version="0.5.0",
     author="lloydzhou",
     author_email="lloydzhou@qq.com",
     description="A Python client for OpenAPI specifications using httpx",
@@ -17,11 +17,16 @@ setup(
         "httpx>=0.23.0",
         "pyyaml>=6.0",
     ],
+    extras_require={
+        "http2": ["httpx[http2]"],
+        "speedups": ["orjson"],
+        "test": ["pytest"],
+    },
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
         "Operating System :: OS Independent",
     ],
-    python_requires=">=3.7",
+    python_requires=">=3.8",
 )
 
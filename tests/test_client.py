@@ -0,0 +1,286 @@
+import asyncio
+import json
+
+import httpx
+
+from openapiclient import OpenAPIClient
+
+
+SPEC = {
+    "openapi": "3.0.0",
+    "servers": [{"url": "https://api.example.com/v1"}],
+    "paths": {},
+}
+
+
+def routed_transport(client, url):
+    """Return the transport the client's session sends a request for url to"""
+    request = client.session.build_request("GET", url)
+    return client.session._transport_for_url(request.url)
+
+
+def test_environment_proxies_are_mounted(monkeypatch):
+    monkeypatch.setenv("HTTPS_PROXY", "http://proxy.example.com:3128")
+    monkeypatch.setenv("NO_PROXY", "localhost")
+    api = OpenAPIClient(SPEC)
+
+    for client in (api.Client(), api.AsyncClient()):
+        default = routed_transport(client, "http://api.example.com")
+        assert routed_transport(client, "https://api.example.com") is not default
+        assert routed_transport(client, "https://localhost") is default
+
+
+def test_environment_proxies_are_ignored_without_trust_env(monkeypatch):
+    monkeypatch.setenv("HTTPS_PROXY", "http://proxy.example.com:3128")
+    client = OpenAPIClient(SPEC).Client(trust_env=False)
+    assert routed_transport(client, "https://api.example.com") is routed_transport(client, "http://api.example.com")
+
+
+JOB_SPEC = {
+    "openapi": "3.0.0",
+    "servers": [{"url": "https://api.example.com/v1"}],
+    "paths": {
+        "/jobs": {
+            "post": {
+                "operationId": "createJob",
+                "requestBody": {
+                    "content": {"application/json": {"schema": {"$ref": "#/components/schemas/Job"}}},
+                },
+            },
+        },
+    },
+    "components": {
+        "schemas": {
+            "Job": {"type": "object", "properties": {"name": {"type": "string"}, "timeout": {"type": "integer"}}},
+        },
+    },
+}
+
+
+def recording_transport(requests):
+    """MockTransport that records the requests and echoes the URL"""
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={"url": str(request.url)})
+    return httpx.MockTransport(handler)
+
+
+def test_body_property_named_like_httpx_option_stays_in_body():
+    requests = []
+    with OpenAPIClient(JOB_SPEC).Client(transport=recording_transport(requests)) as client:
+        client.createJob(name="x", timeout=30)
+        # Options that are not body properties still reach httpx
+        client.createJob(name="y", follow_redirects=False)
+
+    assert json.loads(requests[0].content) == {"name": "x", "timeout": 30}
+    assert json.loads(requests[1].content) == {"name": "y"}
+
+
+def test_tools_are_not_shared_between_api_instances():
+    with OpenAPIClient(json.loads(json.dumps(JOB_SPEC))).Client() as client:
+        client.tools[0]["function"]["description"] = "MUTATED"
+    with OpenAPIClient(json.loads(json.dumps(JOB_SPEC))).Client() as client:
+        assert client.tools[0]["function"]["description"] != "MUTATED"
+        assert json.loads(client.tools_json) == client.tools
+
+
+PARAM_SPEC = {
+    "openapi": "3.0.0",
+    "servers": [{"url": "https://api.example.com/v1"}],
+    "paths": {
+        "/files/{path}": {
+            "get": {
+                "operationId": "getFile",
+                "parameters": [
+                    {"name": "path", "in": "path", "required": True},
+                    {"name": "X-Trace", "in": "header"},
+                    {"name": "sid", "in": "cookie"},
+                ],
+            },
+        },
+    },
+}
+
+
+def test_header_and_cookie_parameters_are_routed_to_headers():
+    requests = []
+    with OpenAPIClient(PARAM_SPEC).Client(transport=recording_transport(requests)) as client:
+        client.getFile("x", **{"X-Trace": 7, "sid": "a;b"})
+
+    assert requests[0].headers["X-Trace"] == "7"
+    assert requests[0].headers["Cookie"] == "sid=a%3Bb"
+    assert "X-Trace" not in requests[0].url.params
+
+
+def test_cookie_parameters_are_merged_with_other_cookies():
+    requests = []
+    api = OpenAPIClient(PARAM_SPEC)
+    with api.Client(transport=recording_transport(requests), cookies={"session": "abc"}) as client:
+        client.getFile("x", sid="1")
+        client.getFile("x", sid="2", headers={"cookie": "theme=dark"})
+
+    assert requests[0].headers["Cookie"] == "session=abc; sid=1"
+    assert requests[1].headers["Cookie"] == "theme=dark; session=abc; sid=2"
+
+    # Without servers the operation URL is relative to the session's base URL
+    api = OpenAPIClient({**PARAM_SPEC, "servers": []})
+    transport = recording_transport(requests)
+    with api.Client(transport=transport, base_url="https://x.example.com", cookies={"a": "b"}) as client:
+        client.getFile("x", sid="1")
+
+    assert requests[2].url == "https://x.example.com/files/x"
+    assert requests[2].headers["Cookie"] == "a=b; sid=1"
+
+
+def test_yaml_file_definition_is_reparsed_when_changed(tmp_path):
+    path = tmp_path / "openapi.yaml"
+    path.write_text("openapi: 3.0.0\npaths: {}\ninfo: {title: one}\n")
+    first = OpenAPIClient(str(path))
+    first._load_definition_sync()
+    second = OpenAPIClient(str(path))
+    second._load_definition_sync()
+    assert second.definition == first.definition
+    assert second.definition is not first.definition
+
+    path.write_text("openapi: 3.0.0\npaths: {}\ninfo: {title: second}\n")
+    third = OpenAPIClient(str(path))
+    third._load_definition_sync()
+    assert third.definition["info"]["title"] == "second"
+
+
+def test_caller_supplied_session_is_not_modified():
+    session = httpx.Client(transport=recording_transport([]))
+    with OpenAPIClient(SPEC, httpx_client=session).Client() as client:
+        assert client.session is session
+    assert str(session.base_url) == ""
+
+    with OpenAPIClient(SPEC).Client() as client:
+        assert str(client.session.base_url) == "https://api.example.com/v1/"
+
+
+def test_api_response_mapping_methods():
+    requests = []
+    with OpenAPIClient(PARAM_SPEC).Client(transport=recording_transport(requests)) as client:
+        response = client.getFile("x")
+
+    assert list(response.keys()) == ["data", "status", "headers", "config"]
+    assert dict(response.items()) == dict(response)
+    assert list(response.values()) == [response[key] for key in response.keys()]
+    assert json.loads(json.dumps(response.to_dict()))["status"] == 200
+
+
+def test_operations_are_listed_by_dir():
+    client = OpenAPIClient(PARAM_SPEC).Client(transport=recording_transport([]))
+    assert "getFile" not in dir(client)
+    with client:
+        assert "getFile" in dir(client)
+        assert "batch" in dir(client)
+
+
+def test_path_parameter_values_are_percent_encoded():
+    requests = []
+    with OpenAPIClient(PARAM_SPEC).Client(transport=recording_transport(requests)) as client:
+        client.getFile(path="a b/c?d#e")
+
+    assert requests[0].url.raw_path == b"/v1/files/a%20b%2Fc%3Fd%23e"
+
+
+def test_identical_gets_in_flight_share_one_request():
+    async def main():
+        calls = []
+        release = asyncio.Event()
+
+        async def handler(request):
+            calls.append(request)
+            await release.wait()
+            return httpx.Response(200, json={"url": str(request.url)})
+
+        api = OpenAPIClient(PARAM_SPEC)
+        async with api.AsyncClient(coalesce_requests=True, transport=httpx.MockTransport(handler)) as client:
+            first = asyncio.ensure_future(client.getFile("x"))
+            cancelled = asyncio.ensure_future(client.getFile("x"))
+            other = asyncio.ensure_future(client.getFile("y"))
+            await asyncio.sleep(0)
+            # Cancelling one waiter must not cancel the request the others wait for
+            cancelled.cancel()
+            await asyncio.sleep(0)
+            release.set()
+            first_response, other_response = await asyncio.gather(first, other)
+            assert cancelled.cancelled()
+            assert client._inflight == {}
+
+            # Without an identical request in flight, a new request is sent
+            await client.getFile("x")
+        return calls, first_response, other_response
+
+    calls, first_response, other_response = asyncio.run(main())
+    assert [request.url.path for request in calls] == ["/v1/files/x", "/v1/files/y", "/v1/files/x"]
+    assert first_response.data["url"].endswith("/files/x")
+    assert other_response.data["url"].endswith("/files/y")
+
+
+def test_gets_are_not_coalesced_by_default():
+    async def main():
+        calls = []
+
+        async def handler(request):
+            calls.append(request)
+            return httpx.Response(200, json={})
+
+        async with OpenAPIClient(PARAM_SPEC).AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            await asyncio.gather(client.getFile("x"), client.getFile("x"))
+        return calls
+
+    assert len(asyncio.run(main())) == 2
+
+
+def test_url_definition_is_reused_on_not_modified(tmp_path):
+    url = "https://specs.example.com/openapi.json"
+    seen = []
+
+    def handler(request):
+        if request.url.host == "specs.example.com":
+            seen.append(request.headers.get("If-None-Match"))
+            if request.headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, json=PARAM_SPEC, headers={"ETag": '"v1"'})
+        return httpx.Response(200, json={})
+
+    for _ in range(2):
+        api = OpenAPIClient(url, cache_dir=str(tmp_path))
+        with api.Client(transport=httpx.MockTransport(handler)) as client:
+            assert client.operations == ["getFile"]
+
+    assert seen == [None, '"v1"']
+    # Entries are stored as plain JSON
+    [entry] = tmp_path.iterdir()
+    assert json.loads(entry.read_bytes())["etag"] == '"v1"'
+
+
+CYCLE_REFERENCES = {
+    "#/components/schemas/A": {"type": "object", "properties": {"b": {"$ref": "#/components/schemas/B"}}},
+    "#/components/schemas/B": {"type": "object", "properties": {"a": {"$ref": "#/components/schemas/A"}}},
+}
+
+
+def resolve_all(refs):
+    """Resolve the given references in order with one shared memo"""
+    api = OpenAPIClient(SPEC)
+    memo = {}
+    return {ref: api.resolve_schema_ref({"$ref": ref}, CYCLE_REFERENCES, memo) for ref in refs}
+
+
+def test_schema_reference_cycles_are_cut():
+    resolved = resolve_all(["#/components/schemas/A"])["#/components/schemas/A"]
+    assert resolved["properties"]["b"]["properties"]["a"] == {"$ref": "#/components/schemas/A"}
+
+
+def test_schema_references_resolve_independent_of_order():
+    refs = ["#/components/schemas/A", "#/components/schemas/B"]
+    assert resolve_all(refs) == resolve_all(refs[::-1])
+
+
+def test_schema_references_do_not_modify_definition():
+    original = json.loads(json.dumps(CYCLE_REFERENCES))
+    resolve_all(["#/components/schemas/A", "#/components/schemas/B"])
+    assert CYCLE_REFERENCES == original